@@ -5,6 +5,7 @@ Fetches comments from JSONPlaceholder API, analyzes data with pandas,
 creates visualizations with matplotlib, and exports to CSV.
 """
 
+import argparse
 import requests
 import pandas as pd
 import matplotlib
@@ -15,35 +16,62 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 import statistics
+from render import (OUTPUT_FORMATS, RENDER_PROFILES, check_format,
+                    get_profile, save_aggregates, save_figure)
+from writer import COMPRESSIONS, BackgroundWriter, write_atomic
 
 class CommentsAnalyzer:
     def __init__(self):
         self.api_url = "https://jsonplaceholder.typicode.com/comments"
+        self.output_dir = "/home/runner/work/CSV-BETO/CSV-BETO"
         self.data = None
         self.processed_data = None
+        self.using_mock_data = False
         
     def fetch_comments(self) -> pd.DataFrame:
         """
         Fetch comments data from JSONPlaceholder API with fallback to mock data
         """
-        print("Fetching comments from JSONPlaceholder API...")
-        
+        df = self.derive_features(pd.DataFrame(self.fetch_raw_comments()))
+        self.data = df
+        return df
+    
+    def fetch_raw_comments(self) -> List[Dict]:
+        """
+        Fetch the raw comment records from the API, falling back to mock data.
+        using_mock_data tells whether the last fetch fell back.
+        """
         try:
-            response = requests.get(self.api_url, timeout=10)
-            response.raise_for_status()
-            
-            comments_data = response.json()
-            print(f"Successfully fetched {len(comments_data)} comments from API")
-            
+            comments_data = self.fetch_api_comments()
+            self.using_mock_data = False
         except requests.RequestException as e:
             print(f"Error fetching data from API: {e}")
             print("Using mock data for demonstration...")
             comments_data = self._generate_mock_data()
-            
-        # Convert to DataFrame
-        df = pd.DataFrame(comments_data)
+            self.using_mock_data = True
+        return comments_data
+    
+    def fetch_api_comments(self) -> List[Dict]:
+        """
+        Fetch the raw comment records from the API, without the mock data
+        fallback. Raises requests.RequestException when the API is unavailable.
+        """
+        print("Fetching comments from JSONPlaceholder API...")
+        
+        response = requests.get(self.api_url, timeout=10)
+        response.raise_for_status()
+        
+        comments_data = response.json()
+        print(f"Successfully fetched {len(comments_data)} comments from API")
+        return comments_data
+    
+    def derive_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add the date, week and word count columns to raw comment records
+        """
+        df = df.copy()
         
         # Add synthetic date column for week analysis (since API doesn't provide dates)
         # Generate random dates over the past 10 weeks for demonstration
@@ -54,14 +82,13 @@ class CommentsAnalyzer:
             date = start_date + timedelta(days=random_days)
             dates.append(date)
         
-        df['date'] = dates
+        df['date'] = pd.to_datetime(dates)
         df['week'] = df['date'].dt.isocalendar().week
         df['year_week'] = df['date'].dt.strftime('%Y-W%U')
         
         # Add word count for additional analysis
         df['word_count'] = df['body'].apply(lambda x: len(x.split()))
         
-        self.data = df
         return df
     
     def _generate_mock_data(self) -> List[Dict]:
@@ -150,46 +177,79 @@ class CommentsAnalyzer:
         
         print("Calculating statistics...")
         
-        df = self.processed_data
+        stats = self.compute_statistics(self.processed_data)
         
-        stats = {
+        print(f"Statistics calculated:")
+        print(f"- Total comments: {stats['total_comments']}")
+        print(f"- Average comments per week: {stats['avg_comments_per_week']:.2f}")
+        print(f"- Average word count: {stats['avg_word_count']:.2f}")
+        
+        return stats
+    
+    @staticmethod
+    def compute_statistics(df: pd.DataFrame) -> Dict:
+        """
+        Compute the statistics dictionary for any processed DataFrame
+        (the full dataset or a filtered subset of it)
+        """
+        weekly_counts = df.groupby('year_week').size()
+        return {
             'total_comments': len(df),
             'unique_users': df['email'].nunique(),
             'unique_posts': df['postId'].nunique(),
-            'avg_comments_per_week': df.groupby('year_week').size().mean(),
-            'median_comments_per_week': df.groupby('year_week').size().median(),
-            'std_comments_per_week': df.groupby('year_week').size().std(),
+            'avg_comments_per_week': weekly_counts.mean(),
+            'median_comments_per_week': weekly_counts.median(),
+            'std_comments_per_week': weekly_counts.std(),
             'avg_word_count': df['word_count'].mean(),
             'median_word_count': df['word_count'].median(),
             'avg_comment_length': df['body'].str.len().mean(),
             'median_comment_length': df['body'].str.len().median(),
             'top_email_domains': df['email_domain'].value_counts().head(5).to_dict(),
-            'comments_by_week': df.groupby('year_week').size().to_dict(),
+            'comments_by_week': weekly_counts.to_dict(),
             'word_count_by_length_category': df.groupby('text_length_category')['word_count'].mean().to_dict()
         }
-        
-        print(f"Statistics calculated:")
-        print(f"- Total comments: {stats['total_comments']}")
-        print(f"- Average comments per week: {stats['avg_comments_per_week']:.2f}")
-        print(f"- Average word count: {stats['avg_word_count']:.2f}")
-        
-        return stats
     
-    def create_visualizations(self, stats: Dict):
+    def create_visualizations(self, stats: Dict, profile: str = 'publication', fmt: str = 'png'):
         """
-        Create various plots using matplotlib and seaborn
+        Create various plots using matplotlib and seaborn.
+        profile selects the render settings ('draft' or 'publication') and
+        fmt the output format ('png', 'svg' or 'json' for raw aggregates).
         """
         print("Creating visualizations...")
         
+        render_profile = get_profile(profile)
+        check_format(fmt)
         df = self.processed_data
         
+        weekly_data = df.groupby('year_week').size().sort_index()
+        category_data = df.groupby('text_length_category')['body'].apply(lambda x: x.str.len().mean())
+        user_activity = df['post_count'].value_counts().head(10)
+        numeric_cols = ['word_count', 'post_count', 'avg_word_count', 'avg_length']
+        correlation_matrix = df[numeric_cols].corr()
+        dashboard_path = f'{self.output_dir}/comments_analysis_dashboard'
+        
+        if fmt == 'json':
+            counts, bin_edges = np.histogram(df['word_count'], bins=30)
+            path = save_aggregates({
+                'comments_per_week': weekly_data,
+                'avg_comments_per_week': stats['avg_comments_per_week'],
+                'word_count_histogram': {'counts': counts, 'bin_edges': bin_edges},
+                'avg_word_count': stats['avg_word_count'],
+                'top_email_domains': stats['top_email_domains'],
+                'avg_length_by_category': category_data,
+                'user_activity': user_activity,
+                'correlation_matrix': correlation_matrix,
+            }, dashboard_path)
+            print(f"Dashboard aggregates saved to: {path}")
+            self._create_additional_plots(df, stats, render_profile, fmt)
+            return
+        
         # Set up the plotting style
         plt.style.use('seaborn-v0_8')
         fig, axes = plt.subplots(2, 3, figsize=(18, 12))
         fig.suptitle('Comments Data Analysis Dashboard', fontsize=16, fontweight='bold')
         
         # 1. Comments per week (time series)
-        weekly_data = df.groupby('year_week').size().sort_index()
         axes[0, 0].plot(range(len(weekly_data)), weekly_data.values, marker='o', linewidth=2)
         axes[0, 0].set_title('Comments per Week')
         axes[0, 0].set_xlabel('Week')
@@ -221,85 +281,99 @@ class CommentsAnalyzer:
         axes[0, 2].tick_params(axis='x', rotation=45)
         
         # 4. Comment length by category
-        category_data = df.groupby('text_length_category')['body'].apply(lambda x: x.str.len().mean())
         axes[1, 0].bar(category_data.index, category_data.values, color='lightgreen')
         axes[1, 0].set_title('Average Comment Length by Category')
         axes[1, 0].set_xlabel('Length Category')
         axes[1, 0].set_ylabel('Average Characters')
         
         # 5. User activity distribution
-        user_activity = df['post_count'].value_counts().head(10)
         axes[1, 1].bar(range(len(user_activity)), user_activity.values, color='orange')
         axes[1, 1].set_title('User Activity Distribution')
         axes[1, 1].set_xlabel('Comments per User')
         axes[1, 1].set_ylabel('Number of Users')
         
         # 6. Correlation heatmap
-        numeric_cols = ['word_count', 'post_count', 'avg_word_count', 'avg_length']
-        correlation_matrix = df[numeric_cols].corr()
         sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=axes[1, 2])
         axes[1, 2].set_title('Feature Correlation Matrix')
         
-        plt.tight_layout()
-        plt.savefig('/home/runner/work/CSV-BETO/CSV-BETO/comments_analysis_dashboard.png', 
-                   dpi=300, bbox_inches='tight')
-        print("Dashboard plot saved to: comments_analysis_dashboard.png")
-        plt.close()
+        fig.tight_layout()
+        path = save_figure(fig, dashboard_path, render_profile, fmt)
+        print(f"Dashboard plot saved to: {path}")
+        plt.close(fig)
         
         # Create additional individual plots
-        self._create_additional_plots(df, stats)
+        self._create_additional_plots(df, stats, render_profile, fmt)
     
-    def _create_additional_plots(self, df: pd.DataFrame, stats: Dict):
+    def _create_additional_plots(self, df: pd.DataFrame, stats: Dict,
+                                 render_profile: Dict, fmt: str):
         """
         Create additional specialized plots
         """
         # Weekly trend analysis
-        plt.figure(figsize=(12, 6))
         weekly_data = df.groupby('year_week').agg({
             'id': 'count',
             'word_count': 'mean'
         }).rename(columns={'id': 'comment_count'})
+        trend_path = f'{self.output_dir}/weekly_trend_analysis'
+        
+        if fmt == 'json':
+            path = save_aggregates({'weekly_trend': weekly_data}, trend_path)
+            print(f"Weekly trend aggregates saved to: {path}")
+            return
         
         # Dual axis plot
         fig, ax1 = plt.subplots(figsize=(12, 6))
-        
-        color = 'tab:blue'
-        ax1.set_xlabel('Week')
-        ax1.set_ylabel('Number of Comments', color=color)
-        bars = ax1.bar(range(len(weekly_data)), weekly_data['comment_count'], 
-                      color=color, alpha=0.7, label='Comments Count')
-        ax1.tick_params(axis='y', labelcolor=color)
-        
-        ax2 = ax1.twinx()
-        color = 'tab:red'
-        ax2.set_ylabel('Average Word Count', color=color)
-        line = ax2.plot(range(len(weekly_data)), weekly_data['word_count'], 
-                       color=color, marker='o', linewidth=2, label='Avg Word Count')
-        ax2.tick_params(axis='y', labelcolor=color)
-        
-        plt.title('Weekly Comments Volume vs Average Word Count')
-        fig.tight_layout()
-        plt.savefig('/home/runner/work/CSV-BETO/CSV-BETO/weekly_trend_analysis.png', 
-                   dpi=300, bbox_inches='tight')
-        print("Weekly trend plot saved to: weekly_trend_analysis.png")
-        plt.close()
+        try:
+            color = 'tab:blue'
+            ax1.set_xlabel('Week')
+            ax1.set_ylabel('Number of Comments', color=color)
+            bars = ax1.bar(range(len(weekly_data)), weekly_data['comment_count'], 
+                          color=color, alpha=0.7, label='Comments Count')
+            ax1.tick_params(axis='y', labelcolor=color)
+        
+            ax2 = ax1.twinx()
+            color = 'tab:red'
+            ax2.set_ylabel('Average Word Count', color=color)
+            line = ax2.plot(range(len(weekly_data)), weekly_data['word_count'], 
+                           color=color, marker='o', linewidth=2, label='Avg Word Count')
+            ax2.tick_params(axis='y', labelcolor=color)
+        
+            ax2.set_title('Weekly Comments Volume vs Average Word Count')
+            fig.tight_layout()
+            path = save_figure(fig, trend_path, render_profile, fmt)
+            print(f"Weekly trend plot saved to: {path}")
+        finally:
+            plt.close(fig)
     
-    def export_to_csv(self):
+    def export_to_csv(self, writer: Optional[BackgroundWriter] = None):
         """
-        Export processed data and statistics to CSV files
+        Export processed data and statistics to CSV files.
+        With a writer the files are queued for background writing and the
+        caller is responsible for flushing it; otherwise they are written
+        before returning.
         """
         print("Exporting data to CSV files...")
         
         if self.processed_data is None:
             raise ValueError("No processed data available.")
         
+        processed_data = self.processed_data
+        
+        def write(path, serialize, label):
+            if writer is None:
+                write_atomic(path, serialize)
+                print(f"{label} exported to: {path}")
+                return path
+            path = writer.submit(path, serialize)
+            print(f"{label} queued for: {path}")
+            return path
+        
         # Export main dataset
-        csv_path = '/home/runner/work/CSV-BETO/CSV-BETO/comments_processed_data.csv'
-        self.processed_data.to_csv(csv_path, index=False)
-        print(f"Processed data exported to: {csv_path}")
+        csv_path = write(f'{self.output_dir}/comments_processed_data.csv',
+                         lambda f: processed_data.to_csv(f, index=False), "Processed data")
         
         # Export weekly statistics
-        weekly_stats = self.processed_data.groupby('year_week').agg({
+        weekly_stats = processed_data.groupby('year_week').agg({
             'id': 'count',
             'word_count': ['mean', 'median', 'std'],
             'body': lambda x: x.str.len().mean()
@@ -307,9 +381,8 @@ class CommentsAnalyzer:
         
         weekly_stats.columns = ['comment_count', 'avg_word_count', 'median_word_count', 
                                'std_word_count', 'avg_comment_length']
-        weekly_stats_path = '/home/runner/work/CSV-BETO/CSV-BETO/weekly_statistics.csv'
-        weekly_stats.to_csv(weekly_stats_path)
-        print(f"Weekly statistics exported to: {weekly_stats_path}")
+        weekly_stats_path = write(f'{self.output_dir}/weekly_statistics.csv',
+                                  weekly_stats.to_csv, "Weekly statistics")
         
         # Export summary statistics
         stats = self.calculate_statistics()
@@ -319,13 +392,12 @@ class CommentsAnalyzer:
                 summary_stats.append({'metric': key, 'value': value})
         
         summary_df = pd.DataFrame(summary_stats)
-        summary_path = '/home/runner/work/CSV-BETO/CSV-BETO/summary_statistics.csv'
-        summary_df.to_csv(summary_path, index=False)
-        print(f"Summary statistics exported to: {summary_path}")
+        summary_path = write(f'{self.output_dir}/summary_statistics.csv',
+                             lambda f: summary_df.to_csv(f, index=False), "Summary statistics")
         
         return csv_path, weekly_stats_path, summary_path
 
-def main():
+def main(profile: str = 'publication', fmt: str = 'png', compression: Optional[str] = None):
     """
     Main function to run the complete analysis pipeline
     """
@@ -334,12 +406,13 @@ def main():
     print("1. Fetch 500+ comments from JSONPlaceholder API")
     print("2. Process data with pandas")
     print("3. Calculate various statistics")
-    print("4. Create visualizations with matplotlib")
-    print("5. Export results to CSV files")
+    print("4. Queue CSV exports for background writing")
+    print("5. Create visualizations with matplotlib")
     print("=" * 50)
     
     # Initialize analyzer
     analyzer = CommentsAnalyzer()
+    writer = BackgroundWriter(compression=compression)
     
     try:
         # Step 1: Fetch data
@@ -354,20 +427,24 @@ def main():
         stats = analyzer.calculate_statistics()
         print("✓ Statistics calculated")
         
-        # Step 4: Create visualizations
-        analyzer.create_visualizations(stats)
+        # Step 4: Export to CSV (written in the background while plotting)
+        csv_files = analyzer.export_to_csv(writer)
+        print("✓ CSV exports queued")
+        
+        # Step 5: Create visualizations
+        analyzer.create_visualizations(stats, profile=profile, fmt=fmt)
         print("✓ Visualizations created")
         
-        # Step 5: Export to CSV
-        csv_files = analyzer.export_to_csv()
+        # Wait for the background writes to land (raises if any failed)
+        writer.close()
         print("✓ Data exported to CSV files")
         
         print("\n=== Analysis Complete ===")
         print("Generated files:")
         for file_path in csv_files:
             print(f"- {file_path}")
-        print("- comments_analysis_dashboard.png")
-        print("- weekly_trend_analysis.png")
+        print(f"- comments_analysis_dashboard.{fmt}")
+        print(f"- weekly_trend_analysis.{fmt}")
         
         # Print key statistics
         print(f"\n=== Key Statistics ===")
@@ -380,7 +457,19 @@ def main():
         
     except Exception as e:
         print(f"Error during analysis: {e}")
+        # Report pending writes without masking the original error
+        for result in writer.close(report=False):
+            if result['error'] is not None:
+                print(f"Error writing {result['path']}: {result['error']}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="CSV-BETO comments analysis")
+    parser.add_argument('--profile', choices=list(RENDER_PROFILES), default='publication',
+                        help="render profile for the plots")
+    parser.add_argument('--format', dest='fmt', choices=OUTPUT_FORMATS, default='png',
+                        help="plot output: png, svg or json (raw aggregates)")
+    parser.add_argument('--compression', choices=list(COMPRESSIONS), default=None,
+                        help="compress the exported CSV files")
+    args = parser.parse_args()
+    main(profile=args.profile, fmt=args.fmt, compression=args.compression)
\ No newline at end of file
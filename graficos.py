@@ -1,70 +1,100 @@
 import pandas as pd
+import numpy as np
 import seaborn as sns
-import matplotlib.pyplot as plt
 import time
+from typing import Optional
 from utils import cab
+from render import FigureTemplate, check_format, get_profile, save_aggregates, save_figure
 
 
-def plotar_graficos(df: pd.DataFrame) -> None:
+def plotar_graficos(df: pd.DataFrame, perfil: Optional[str] = None, formato: str = "png") -> None:
     """
     Cria e salva gráficos a partir do DataFrame usando apenas seaborn.
     Inclui medição de tempo de execução.
+    Args:
+        df (pd.DataFrame): DataFrame com os comentários.
+        perfil (Optional[str]): Perfil de renderização ("draft" ou "publication").
+            None mantém as configurações padrão do matplotlib.
+        formato (str): "png", "svg" ou "json" (apenas os agregados de cada gráfico).
+    Returns:
+        None
     """
     cab("5. CRIAÇÃO DE GRÁFICOS")
 
     inicio_total: float = time.time()
+    template: Optional[FigureTemplate] = None
 
     try:
+        perfil_render = get_profile(perfil)
+        check_format(formato)
         sns.set_theme(style="whitegrid")
+        if formato != "json":
+            template = FigureTemplate(figsize=(12, 6))
 
         # Gráfico 1
         inicio = time.time()
         df["dominio"] = df["email"].apply(lambda x: str(x).split("@")[-1])
         top10_dominios = df["dominio"].value_counts().head(10)
 
-        plt.figure(figsize=(12, 6))
-        ax1 = sns.barplot(x=top10_dominios.index, y=top10_dominios.values, color="purple")
-        ax1.set_title("Top 10 domínios de e-mail nos comentários")
-        ax1.set_xlabel("Domínio de e-mail")
-        ax1.set_ylabel("Frequência")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig("top10_dominios.png")
-        plt.close()
+        if formato == "json":
+            caminho = save_aggregates({"top10_dominios": top10_dominios}, "top10_dominios")
+        else:
+            fig, ax1 = template.reset(figsize=(12, 6))
+            sns.barplot(x=top10_dominios.index, y=top10_dominios.values, color="purple", ax=ax1)
+            ax1.set_title("Top 10 domínios de e-mail nos comentários")
+            ax1.set_xlabel("Domínio de e-mail")
+            ax1.set_ylabel("Frequência")
+            ax1.tick_params(axis="x", rotation=45)
+            fig.tight_layout()
+            caminho = save_figure(fig, "top10_dominios", perfil_render, formato)
         fim = time.time()
-        print(f"Gráfico 'top10_dominios.png' criado em {fim - inicio:.2f}s")
+        print(f"Gráfico '{caminho}' criado em {fim - inicio:.2f}s")
 
         # Gráfico 2: distribuição do tamanho dos comentários
         inicio = time.time()
-        plt.figure(figsize=(10, 5))
-        ax2 = sns.histplot(df["tamanho"], bins=30, kde=True, color="lightgreen")
         media_caracteres = df["tamanho"].mean()
-        ax2.axvline(media_caracteres, color="red", linestyle="--", label=f"Média: {media_caracteres:.1f}")
-        ax2.set_title("Distribuição do tamanho dos comentários (caracteres)")
-        ax2.set_xlabel("Número de caracteres")
-        ax2.set_ylabel("Frequência")
-        ax2.legend()
-        plt.tight_layout()
-        plt.savefig("tamanho_comentarios.png")
-        plt.close()
+        if formato == "json":
+            contagens, limites = np.histogram(df["tamanho"], bins=30)
+            caminho = save_aggregates({
+                "contagens": contagens,
+                "limites": limites,
+                "media": media_caracteres,
+            }, "tamanho_comentarios")
+        else:
+            fig, ax2 = template.reset(figsize=(10, 5))
+            sns.histplot(df["tamanho"], bins=30, kde=perfil_render["kde"], color="lightgreen", ax=ax2)
+            ax2.axvline(media_caracteres, color="red", linestyle="--", label=f"Média: {media_caracteres:.1f}")
+            ax2.set_title("Distribuição do tamanho dos comentários (caracteres)")
+            ax2.set_xlabel("Número de caracteres")
+            ax2.set_ylabel("Frequência")
+            ax2.legend()
+            fig.tight_layout()
+            caminho = save_figure(fig, "tamanho_comentarios", perfil_render, formato)
         fim = time.time()
-        print(f"Gráfico 'tamanho_comentarios.png' criado em {fim - inicio:.2f}s")
+        print(f"Gráfico '{caminho}' criado em {fim - inicio:.2f}s")
 
         # Gráfico 3: distribuição do número de palavras
         inicio = time.time()
-        plt.figure(figsize=(10, 5))
-        ax3 = sns.histplot(df["num_palavras"], bins=20, kde=True, color="orange")
         media_palavras = df["num_palavras"].mean()
-        ax3.axvline(media_palavras, color="red", linestyle="--", label=f"Média: {media_palavras:.1f}")
-        ax3.set_title("Distribuição de palavras por comentário")
-        ax3.set_xlabel("Número de palavras")
-        ax3.set_ylabel("Frequência")
-        ax3.legend()
-        plt.tight_layout()
-        plt.savefig("palavras_por_comentario.png")
-        plt.close()
+        if formato == "json":
+            contagens, limites = np.histogram(df["num_palavras"], bins=20)
+            caminho = save_aggregates({
+                "contagens": contagens,
+                "limites": limites,
+                "media": media_palavras,
+            }, "palavras_por_comentario")
+        else:
+            fig, ax3 = template.reset(figsize=(10, 5))
+            sns.histplot(df["num_palavras"], bins=20, kde=perfil_render["kde"], color="orange", ax=ax3)
+            ax3.axvline(media_palavras, color="red", linestyle="--", label=f"Média: {media_palavras:.1f}")
+            ax3.set_title("Distribuição de palavras por comentário")
+            ax3.set_xlabel("Número de palavras")
+            ax3.set_ylabel("Frequência")
+            ax3.legend()
+            fig.tight_layout()
+            caminho = save_figure(fig, "palavras_por_comentario", perfil_render, formato)
         fim = time.time()
-        print(f"Gráfico 'palavras_por_comentario.png' criado em {fim - inicio:.2f}s")
+        print(f"Gráfico '{caminho}' criado em {fim - inicio:.2f}s")
 
         # Gráfico 4: volume semanal de comentários x média de palavras
         inicio = time.time()
@@ -74,26 +104,33 @@ def plotar_graficos(df: pd.DataFrame) -> None:
             media_palavras=("num_palavras", "mean")
         ).reset_index()
 
-        plt.figure(figsize=(12, 6))
-        ax4 = sns.barplot(x="semana", y="comentarios_semana", data=weekly_data, color="skyblue")
-        ax4.set_title("Volume semanal de comentários x Média de palavras")
-        ax4.set_xlabel("Semana")
-        ax4.set_ylabel("Número de comentários", color="blue")
+        if formato == "json":
+            caminho = save_aggregates({"semanas": weekly_data}, "comentarios_semana_vs_palavras")
+        else:
+            fig, ax4 = template.reset(figsize=(12, 6))
+            sns.barplot(x="semana", y="comentarios_semana", data=weekly_data, color="skyblue", ax=ax4)
+            ax4.set_title("Volume semanal de comentários x Média de palavras")
+            ax4.set_xlabel("Semana")
+            ax4.set_ylabel("Número de comentários", color="blue")
 
-        ax5 = ax4.twinx()
-        sns.lineplot(x="semana", y="media_palavras", data=weekly_data, color="red", marker="o", ax=ax5)
-        ax5.set_ylabel("Média de palavras", color="red")
+            ax5 = ax4.twinx()
+            sns.lineplot(x="semana", y="media_palavras", data=weekly_data, color="red", marker="o", ax=ax5)
+            ax5.set_ylabel("Média de palavras", color="red")
 
-        plt.tight_layout()
-        plt.savefig("comentarios_semana_vs_palavras.png")
-        plt.close()
+            fig.tight_layout()
+            caminho = save_figure(fig, "comentarios_semana_vs_palavras", perfil_render, formato)
         fim = time.time()
-        print(f"Gráfico 'comentarios_semana_vs_palavras.png' criado em {fim - inicio:.2f}s")
+        print(f"Gráfico '{caminho}' criado em {fim - inicio:.2f}s")
 
     except KeyError as e:
         print(f"Erro: coluna não encontrada no DataFrame ({e}).")
+    except ValueError as e:
+        print(f"Erro: {e}")
     except Exception as e:
         print(f"Erro inesperado na criação dos gráficos: {e}")
+    finally:
+        if template is not None:
+            template.close()
 
     fim_total: float = time.time()
-    print(f"Tempo total para gerar todos os gráficos: {fim_total - inicio_total:.2f}s")
\ No newline at end of file
+    print(f"Tempo total para gerar todos os gráficos: {fim_total - inicio_total:.2f}s")
@@ -1,9 +1,13 @@
-from utils import fetch_api_data, salvar_json, converter_para_csv
+import argparse
+from typing import Optional
+from utils import aguardar_gravacoes, fetch_api_data, salvar_json, converter_para_csv
 from analise import analisar_dados
 from graficos import plotar_graficos
+from render import OUTPUT_FORMATS, RENDER_PROFILES
+from writer import COMPRESSIONS, BackgroundWriter
 
 
-def main() -> None:
+def main(perfil: Optional[str] = None, formato: str = "png", compressao: Optional[str] = None) -> None:
     """
     Executa o fluxo principal do projeto:
     1) Busca dados da API
@@ -11,6 +15,14 @@ def main() -> None:
     3) Converte para CSV
     4) Analisa estatísticas
     5) Gera gráficos com seaborn
+    As gravações de JSON e CSV rodam em segundo plano enquanto a análise
+    e os gráficos são gerados.
+    Args:
+        perfil (Optional[str]): Perfil de renderização dos gráficos ("draft" ou "publication").
+        formato (str): Formato de saída dos gráficos ("png", "svg" ou "json").
+        compressao (Optional[str]): Compressão dos arquivos JSON/CSV ("gzip", "bz2" ou "xz").
+    Returns:
+        None
     """
     url: str = "https://jsonplaceholder.typicode.com/comments"
 
@@ -20,20 +32,29 @@ def main() -> None:
         print("Execução encerrada: não foi possível obter dados da API.")
         return
 
-    #Salva em JSON
-    salvar_json(dados, "comentarios.json")
+    escritor = BackgroundWriter(compression=compressao)
+    try:
+        #Salva em JSON
+        salvar_json(dados, "comentarios.json", escritor)
 
-    #Converte para CSV
-    df = converter_para_csv(dados, "comentarios.csv")
-    if df is None:
-        print("Execução encerrada: não foi possível criar o CSV.")
-        return
+        #Converte para CSV
+        df = converter_para_csv(dados, "comentarios.csv", escritor)
+        if df is None:
+            print("Execução encerrada: não foi possível criar o CSV.")
+            return
+
+        # Analisa estatísticas
+        estatisticas = analisar_dados(df)
 
-    # Analisa estatísticas
-    estatisticas = analisar_dados(df)
+        # Gera gráficos
+        plotar_graficos(df, perfil=perfil, formato=formato)
+    finally:
+        # Aguarda os arquivos gravados em segundo plano
+        gravacoes_ok: bool = aguardar_gravacoes(escritor)
 
-    # Gera gráficos
-    plotar_graficos(df)
+    if not gravacoes_ok:
+        print("Execução encerrada: não foi possível salvar todos os arquivos.")
+        return
 
     print("\nExecução finalizada com sucesso.")
     print("Estatísticas principais calculadas:")
@@ -42,4 +63,12 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Análise dos comentários da API JSONPlaceholder")
+    parser.add_argument("--perfil", choices=list(RENDER_PROFILES), default=None,
+                        help="perfil de renderização dos gráficos")
+    parser.add_argument("--formato", choices=OUTPUT_FORMATS, default="png",
+                        help="formato de saída: png, svg ou json (agregados)")
+    parser.add_argument("--compressao", choices=list(COMPRESSIONS), default=None,
+                        help="compressão dos arquivos JSON/CSV gerados")
+    args = parser.parse_args()
+    main(perfil=args.perfil, formato=args.formato, compressao=args.compressao)
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Render profiles and figure reuse shared by the dashboard and the seaborn charts.
+"""
+
+import json
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend for headless environment
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+# draft: quick previews (low DPI, no tight-bbox pass, no KDE)
+# publication: the full-quality output the dashboard has always produced
+RENDER_PROFILES: Dict[str, Dict[str, Any]] = {
+    'draft': {'dpi': 72, 'bbox_inches': None, 'kde': False},
+    'publication': {'dpi': 300, 'bbox_inches': 'tight', 'kde': True},
+}
+
+OUTPUT_FORMATS = ('png', 'svg', 'json')
+
+
+def get_profile(name: Optional[str]) -> Dict[str, Any]:
+    """
+    Return the settings for a render profile. None keeps matplotlib's
+    savefig defaults (with KDE enabled).
+    """
+    if name is None:
+        return {'dpi': None, 'bbox_inches': None, 'kde': True}
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{name}'. "
+                         f"Choose from: {', '.join(RENDER_PROFILES)}")
+    return RENDER_PROFILES[name]
+
+
+def check_format(fmt: str) -> str:
+    """
+    Validate an output format name
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}'. "
+                         f"Choose from: {', '.join(OUTPUT_FORMATS)}")
+    return fmt
+
+
+class FigureTemplate:
+    """
+    A single figure/axes pair that is cleared between charts instead of
+    building a new figure for every plot.
+    """
+
+    def __init__(self, figsize: Tuple[float, float] = (12, 6)):
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+
+    def reset(self, figsize: Optional[Tuple[float, float]] = None):
+        """
+        Clear the template (dropping twin axes and the suptitle left by the
+        previous chart) and return the figure and its main axes in the same
+        state as a freshly created one
+        """
+        for extra_ax in self.fig.axes:
+            if extra_ax is not self.ax:
+                extra_ax.remove()
+        if self.fig._suptitle is not None:
+            self.fig._suptitle.remove()
+            self.fig._suptitle = None
+        self.ax.clear()
+        # clear() keeps tick_params (e.g. label rotation); go back to rcParams
+        # the same way matplotlib sets up a new axes
+        rc = matplotlib.rcParams
+        self.ax.tick_params(axis='both', which='both', reset=True)
+        for which in ('major', 'minor'):
+            self.ax.tick_params(
+                which=which,
+                top=rc['xtick.top'] and rc[f'xtick.{which}.top'],
+                bottom=rc['xtick.bottom'] and rc[f'xtick.{which}.bottom'],
+                labeltop=rc['xtick.labeltop'] and rc[f'xtick.{which}.top'],
+                labelbottom=rc['xtick.labelbottom'] and rc[f'xtick.{which}.bottom'],
+                left=rc['ytick.left'] and rc[f'ytick.{which}.left'],
+                right=rc['ytick.right'] and rc[f'ytick.{which}.right'],
+                labelleft=rc['ytick.labelleft'] and rc[f'ytick.{which}.left'],
+                labelright=rc['ytick.labelright'] and rc[f'ytick.{which}.right'])
+        if figsize is not None:
+            self.fig.set_size_inches(figsize)
+        return self.fig, self.ax
+
+    def close(self):
+        plt.close(self.fig)
+
+
+def save_figure(fig, base_path: str, profile: Dict[str, Any], fmt: str = 'png') -> str:
+    """
+    Save a figure as PNG or SVG using the profile's DPI and bbox settings.
+    Returns the written path.
+    """
+    path = f"{base_path}.{fmt}"
+    kwargs: Dict[str, Any] = {'format': fmt}
+    if profile['dpi'] is not None:
+        kwargs['dpi'] = profile['dpi']
+    if profile['bbox_inches'] is not None:
+        kwargs['bbox_inches'] = profile['bbox_inches']
+    fig.savefig(path, **kwargs)
+    return path
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convert pandas/numpy containers and scalars into plain JSON types
+    """
+    if isinstance(value, pd.DataFrame):
+        return {str(col): to_jsonable(value[col]) for col in value.columns}
+    if isinstance(value, pd.Series):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def save_aggregates(data: Dict[str, Any], base_path: str) -> str:
+    """
+    Write the aggregates behind a chart as JSON instead of rendering it.
+    Returns the written path.
+    """
+    path = f"{base_path}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(to_jsonable(data), f, ensure_ascii=False, indent=2)
+    return path
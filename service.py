@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+CSV-BETO: Analysis Service
+Long-running daemon that loads and prepares the comments dataset once,
+refreshes it incrementally on a schedule, and serves statistics and
+filtered aggregates over a local HTTP (or Unix socket) API.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+from comments_analysis import CommentsAnalyzer
+from render import to_jsonable
+
+# Query parameter -> processed DataFrame column
+FILTERS = {
+    'postId': 'postId',
+    'domain': 'email_domain',
+    'week': 'year_week',
+}
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of computed statistics, keyed by dataset version
+    and filters so results from an older dataset are never served
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Tuple, value: Dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class AnalysisService:
+    """
+    Keeps the processed dataset in memory as an immutable snapshot.
+    A refresh builds a new snapshot on the side and swaps it in, so readers
+    keep answering from the previous one while the refresh is running.
+    """
+
+    def __init__(self, refresh_interval: float = 300, cache_size: int = 128):
+        self.refresh_interval = refresh_interval
+        self.analyzer = CommentsAnalyzer()
+        self.cache = ResultCache(cache_size)
+        self._snapshot: Optional[Dict] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+
+    def refresh(self) -> Dict:
+        """
+        Fetch comments and sync the dataset with them: new comments are
+        added, comments gone from the API are dropped and edited ones
+        (changed name, email, body or postId) are replaced. Unchanged rows
+        keep their derived features; only added and edited rows are
+        prepared, after which the per-user aggregates are recomputed over
+        the whole dataset.
+
+        Mock data is only used for the initial load. Once data is loaded, an
+        API failure raises requests.RequestException and the current
+        snapshot is kept; a snapshot built from mock data is fully replaced
+        by the first successful fetch.
+        """
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                raw = pd.DataFrame(self.analyzer.fetch_raw_comments())
+                mock = self.analyzer.using_mock_data
+            else:
+                raw = pd.DataFrame(self.analyzer.fetch_api_comments())
+                mock = False
+
+            if snapshot is None or snapshot['mock']:
+                data = self.analyzer.derive_features(raw)
+            else:
+                base = self.analyzer.data
+                source_cols = [c for c in raw.columns if c != 'id']
+                kept = base[base['id'].isin(raw['id'])]
+                latest = raw.set_index('id').loc[kept['id'], source_cols]
+                previous = kept.set_index('id')[latest.columns]
+                edited_ids = latest.index[(latest != previous).any(axis=1)]
+                unchanged = kept[~kept['id'].isin(edited_ids)]
+                to_prepare = raw[~raw['id'].isin(unchanged['id'])]
+
+                added = len(to_prepare) - len(edited_ids)
+                removed = len(base) - len(kept)
+                if not added and not removed and not len(edited_ids):
+                    print("Refresh: no changes")
+                    return self.status()
+                print(f"Refresh: {added} new, {len(edited_ids)} edited, {removed} removed comments")
+                data = pd.concat([unchanged, self.analyzer.derive_features(to_prepare)],
+                                 ignore_index=True)
+
+            self.analyzer.data = data
+            processed = self.analyzer.process_data()
+            version = 1 if snapshot is None else snapshot['version'] + 1
+            self._snapshot = {
+                'version': version,
+                'data': processed,
+                'stats': CommentsAnalyzer.compute_statistics(processed),
+                'loaded_at': datetime.now().isoformat(timespec='seconds'),
+                'mock': mock,
+            }
+            self.cache.clear()
+            return self.status()
+
+    def status(self) -> Dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'loaded': False}
+        return {
+            'loaded': True,
+            'version': snapshot['version'],
+            'rows': len(snapshot['data']),
+            'loaded_at': snapshot['loaded_at'],
+            'mock': snapshot['mock'],
+        }
+
+    def statistics(self, filters: Dict[str, str]) -> Dict:
+        """
+        Statistics for the whole dataset, or for the rows matching the
+        given postId / domain / week filters
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Dataset not loaded yet")
+        if not filters:
+            return snapshot['stats']
+
+        key = (snapshot['version'],) + tuple(sorted(filters.items()))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        df = snapshot['data']
+        mask = pd.Series(True, index=df.index)
+        for name, value in filters.items():
+            if name == 'postId':
+                value = int(value)
+            mask &= df[FILTERS[name]] == value
+        stats = CommentsAnalyzer.compute_statistics(df[mask])
+        self.cache.put(key, stats)
+        return stats
+
+    def start_scheduler(self):
+        """
+        Refresh the dataset every refresh_interval seconds in the background
+        """
+        def run():
+            while not self._stop.wait(self.refresh_interval):
+                try:
+                    self.refresh()
+                except requests.RequestException as e:
+                    print(f"Error during scheduled refresh, keeping current data: {e}")
+                except Exception as e:
+                    print(f"Error during scheduled refresh: {e}")
+
+        self._scheduler = threading.Thread(target=run, name='refresh-scheduler', daemon=True)
+        self._scheduler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._scheduler is not None:
+            self._scheduler.join()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health                         dataset version and size
+    GET  /stats?postId=&domain=&week=    calculate_statistics-style results
+    POST /refresh                        refresh the dataset now
+    """
+
+    service: AnalysisService = None
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _send_json(self, status: int, body: Dict):
+        payload = json.dumps(to_jsonable(body), ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send_json(200, self.service.status())
+        elif url.path == '/stats':
+            query = parse_qs(url.query)
+            unknown = set(query) - set(FILTERS)
+            if unknown:
+                self._send_json(400, {'error': f"Unknown filters: {', '.join(sorted(unknown))}"})
+                return
+            filters = {name: values[-1] for name, values in query.items()}
+            try:
+                self._send_json(200, self.service.statistics(filters))
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+            except RuntimeError as e:
+                self._send_json(503, {'error': str(e)})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path == '/refresh':
+            try:
+                self._send_json(200, self.service.refresh())
+            except requests.RequestException as e:
+                self._send_json(503, {'error': f"API unavailable, keeping current data: {e}"})
+            except Exception as e:
+                self._send_json(500, {'error': str(e)})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # Only reuse the path if it is a stale socket left by a dead server
+        if os.path.exists(self.server_address):
+            if not stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+                raise OSError(f"{self.server_address} exists and is not a socket")
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.server_address)
+            except ConnectionRefusedError:
+                os.remove(self.server_address)
+            else:
+                raise OSError(f"Another server is already listening on {self.server_address}")
+            finally:
+                probe.close()
+        super().server_bind()
+
+
+def main(host: str = '127.0.0.1', port: int = 8765, socket_path: Optional[str] = None,
+         refresh_interval: float = 300, cache_size: int = 128):
+    """
+    Load the dataset once and serve it until interrupted
+    """
+    print("=== CSV-BETO Analysis Service ===")
+
+    service = AnalysisService(refresh_interval=refresh_interval, cache_size=cache_size)
+    RequestHandler.service = service
+
+    # Bind first so a second daemon on the same address fails before loading
+    if socket_path is not None:
+        server = ThreadingUnixHTTPServer(socket_path, RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+
+    try:
+        service.refresh()
+        print(f"✓ Dataset loaded: {service.status()['rows']} comments")
+        service.start_scheduler()
+
+        if socket_path is not None:
+            print(f"Serving on unix socket {socket_path}")
+        else:
+            print(f"Serving on http://{host}:{port}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.stop()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV-BETO analysis service")
+    parser.add_argument('--host', default='127.0.0.1', help="address to bind the HTTP server")
+    parser.add_argument('--port', type=int, default=8765, help="port for the HTTP server")
+    parser.add_argument('--socket', dest='socket_path', default=None,
+                        help="serve on this Unix socket instead of TCP")
+    parser.add_argument('--refresh-interval', type=float, default=300,
+                        help="seconds between dataset refreshes")
+    parser.add_argument('--cache-size', type=int, default=128,
+                        help="number of filtered results kept in the LRU cache")
+    args = parser.parse_args()
+    main(host=args.host, port=args.port, socket_path=args.socket_path,
+         refresh_interval=args.refresh_interval, cache_size=args.cache_size)
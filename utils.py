@@ -3,6 +3,7 @@ import json
 import pandas as pd
 import time
 from typing import Optional, List, Dict, Any
+from writer import BackgroundWriter, write_atomic
 
 
 def cab(titulo: str) -> None:
@@ -55,20 +56,31 @@ def fetch_api_data(url: str) -> Optional[List[Dict[str, Any]]]:
     return None
 
 
-def salvar_json(dados: List[Dict[str, Any]], nome_arquivo: str) -> None:
+def salvar_json(dados: List[Dict[str, Any]], nome_arquivo: str,
+                escritor: Optional[BackgroundWriter] = None) -> None:
     """
     Salva dados em formato JSON.
     Args:
         dados (List[Dict[str, Any]]): Dados a serem salvos.
         nome_arquivo (str): Caminho/nome do arquivo de saída.
+        escritor (Optional[BackgroundWriter]): Se informado, a gravação é
+            enfileirada em segundo plano e o resultado aparece em aguardar_gravacoes.
     Returns:
         None
     """
     cab("2. SALVAR DADOS BRUTOS EM JSON")
+
+    def serializar(f) -> None:
+        json.dump(dados, f, ensure_ascii=False, indent=4)
+
+    if escritor is not None:
+        caminho: str = escritor.submit(nome_arquivo, serializar)
+        print(f"Arquivo JSON enfileirado para gravação: {caminho}")
+        return
+
     try:
         inicio: float = time.time()
-        with open(nome_arquivo, "w", encoding="utf-8") as f:
-            json.dump(dados, f, ensure_ascii=False, indent=4)
+        write_atomic(nome_arquivo, serializar)
         fim: float = time.time()
         print(f"Arquivo JSON salvo: {nome_arquivo} (em {fim - inicio:.2f}s)")
     except PermissionError:
@@ -79,12 +91,15 @@ def salvar_json(dados: List[Dict[str, Any]], nome_arquivo: str) -> None:
         print(f"Erro inesperado ao salvar JSON: {e}")
 
 
-def converter_para_csv(dados: List[Dict[str, Any]], nome_arquivo: str) -> Optional[pd.DataFrame]:
+def converter_para_csv(dados: List[Dict[str, Any]], nome_arquivo: str,
+                       escritor: Optional[BackgroundWriter] = None) -> Optional[pd.DataFrame]:
     """
     Converte lista de dicionários em CSV usando pandas.
     Args:
         dados (List[Dict[str, Any]]): Dados carregados da API.
         nome_arquivo (str): Nome do arquivo CSV de saída.
+        escritor (Optional[BackgroundWriter]): Se informado, a gravação do CSV é
+            enfileirada em segundo plano e o DataFrame é devolvido imediatamente.
     Returns:
         Optional[pd.DataFrame]: DataFrame criado a partir dos dados,
         ou None em caso de falha.
@@ -93,7 +108,14 @@ def converter_para_csv(dados: List[Dict[str, Any]], nome_arquivo: str) -> Option
     try:
         inicio: float = time.time()
         df: pd.DataFrame = pd.DataFrame(dados)
-        df.to_csv(nome_arquivo, index=False, encoding="utf-8")
+        if escritor is not None:
+            # O DataFrame devolvido recebe colunas novas na análise, então o
+            # CSV é gerado a partir de uma cópia própria
+            df_csv: pd.DataFrame = df.copy()
+            caminho: str = escritor.submit(nome_arquivo, lambda f: df_csv.to_csv(f, index=False))
+            print(f"Arquivo CSV enfileirado para gravação: {caminho}")
+            return df
+        write_atomic(nome_arquivo, lambda f: df.to_csv(f, index=False))
         fim: float = time.time()
         print(f"Arquivo CSV salvo: {nome_arquivo} (em {fim - inicio:.2f}s)")
         return df
@@ -102,4 +124,29 @@ def converter_para_csv(dados: List[Dict[str, Any]], nome_arquivo: str) -> Option
     except Exception as e:
         print(f"Erro inesperado ao salvar CSV: {e}")
     return None
-#
\ No newline at end of file
+
+
+def aguardar_gravacoes(escritor: BackgroundWriter) -> bool:
+    """
+    Aguarda as gravações enfileiradas no escritor e exibe o resultado de cada arquivo.
+    Args:
+        escritor (BackgroundWriter): Escritor com as gravações pendentes.
+    Returns:
+        bool: True se todos os arquivos foram gravados, False caso contrário.
+    """
+    cab("6. GRAVAÇÃO DOS ARQUIVOS")
+    sucesso: bool = True
+    for resultado in escritor.close(report=False):
+        caminho: str = resultado["path"]
+        erro: Optional[Exception] = resultado["error"]
+        if erro is None:
+            print(f"Arquivo salvo: {caminho} ({resultado['bytes']} bytes em {resultado['seconds']:.2f}s)")
+            continue
+        sucesso = False
+        if isinstance(erro, PermissionError):
+            print(f"Erro: permissão negada para salvar o arquivo {caminho}.")
+        elif isinstance(erro, OSError):
+            print(f"Erro de sistema ao salvar o arquivo {caminho}: {erro}")
+        else:
+            print(f"Erro inesperado ao salvar {caminho}: {erro}")
+    return sucesso
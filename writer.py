@@ -0,0 +1,181 @@
+"""
+Background output writer: serialization and disk writes run on a worker
+thread fed by a bounded queue, so analysis and plotting can continue while
+earlier artifacts are still being written.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import IO, Callable, Dict, List, Optional
+
+COMPRESSIONS = {
+    'gzip': ('.gz', gzip.open),
+    'bz2': ('.bz2', bz2.open),
+    'xz': ('.xz', lzma.open),
+}
+
+
+# Read once at import: os.umask can only be queried by setting it, which is
+# not safe to do while other threads create files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _open_text(raw: IO, compression: Optional[str]) -> IO:
+    """
+    Wrap a binary handle in a text handle, optionally through a compressor.
+    Closing the compressed handle leaves the binary handle open.
+    """
+    if compression is None:
+        return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    opener = COMPRESSIONS[compression][1]
+    return opener(raw, 'wt', encoding='utf-8', newline='')
+
+
+def write_atomic(path: str, serialize: Callable[[IO], None],
+                 compression: Optional[str] = None) -> int:
+    """
+    Write through a temporary file in the target directory, fsync it and
+    rename it into place, so readers never see a half-written file, even
+    after a crash. Returns the number of bytes on disk.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    os.close(fd)
+    # mkstemp creates the file as 0600; give it the mode open() would have
+    os.chmod(tmp_path, 0o666 & ~_UMASK)
+    try:
+        with open(tmp_path, 'wb') as raw:
+            f = _open_text(raw, compression)
+            serialize(f)
+            if compression is None:
+                f.flush()
+                f.detach()
+            else:
+                # Writes the compressor's trailer
+                f.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+    return os.path.getsize(path)
+
+
+def _fsync_directory(directory: str):
+    """
+    Persist the rename itself; not supported on every platform
+    """
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class BackgroundWriter:
+    """
+    Queue of pending writes drained by a single worker thread.
+    submit() blocks once max_pending writes are queued; flush() waits for
+    everything submitted so far and reports per-file bytes and write time.
+    """
+
+    def __init__(self, max_pending: int = 4, compression: Optional[str] = None):
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'. "
+                             f"Choose from: {', '.join(COMPRESSIONS)}")
+        self.compression = compression
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._results: List[Dict] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='background-writer', daemon=True)
+        self._worker.start()
+
+    def submit(self, path: str, serialize: Callable[[IO], None]) -> str:
+        """
+        Queue serialize(file_handle) to be written atomically to path.
+        Returns the final path (with the compression suffix, if any).
+        """
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+        if self.compression is not None:
+            path += COMPRESSIONS[self.compression][0]
+        self._queue.put((path, serialize))
+        return path
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            path, serialize = task
+            start = time.perf_counter()
+            result = {'path': path, 'bytes': 0, 'seconds': 0.0, 'error': None}
+            try:
+                result['bytes'] = write_atomic(path, serialize, self.compression)
+            except Exception as e:
+                result['error'] = e
+            result['seconds'] = time.perf_counter() - start
+            with self._lock:
+                self._results.append(result)
+            self._queue.task_done()
+
+    def flush(self, report: bool = True) -> List[Dict]:
+        """
+        Wait until every submitted write has finished and return the results
+        collected since the previous flush. With report=True a line is
+        printed per file and the first write error is re-raised; with
+        report=False nothing is printed and the caller must check each
+        result's 'error'.
+        """
+        self._queue.join()
+        with self._lock:
+            results, self._results = self._results, []
+        if not report:
+            return results
+        for result in results:
+            if result['error'] is not None:
+                print(f"Error writing {result['path']}: {result['error']}")
+            else:
+                print(f"Wrote {result['path']}: {result['bytes']} bytes in {result['seconds']:.2f}s")
+        errors = [result['error'] for result in results if result['error'] is not None]
+        if errors:
+            raise errors[0]
+        return results
+
+    def close(self, report: bool = True) -> List[Dict]:
+        """
+        Flush pending writes (see flush) and stop the worker thread
+        """
+        if self._closed:
+            return []
+        self._closed = True
+        try:
+            return self.flush(report)
+        finally:
+            self._queue.put(None)
+            self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Don't mask an exception that is already propagating
+        self.close(report=exc_type is None)